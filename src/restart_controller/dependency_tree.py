@@ -6,39 +6,87 @@ descendants for efficient restart set calculation.
 
 from __future__ import annotations
 
+import functools
 import logging
+import operator
+from collections import deque
 
 
 class DependencyTree:
     """A tree of deployment dependencies with pre-computed descendants.
 
     Each deployment may have at most one parent and zero or more children.
-    Descendants are computed eagerly so that lookups are O(1).
+    Descendants are computed eagerly so that lookups are O(1). Each deployment
+    is assigned a bit, and descendant sets are stored as integer bitmasks so
+    unions and differences are single integer operations.
     """
 
     def __init__(self) -> None:
         self._logger = logging.getLogger(type(self).__name__)
-        self._children: dict[str, set[str]] = {}
-        self._descendants: dict[str, frozenset[str]] = {}
+        self._children: dict[str, frozenset[str]] = {}
+        self._parents: dict[str, set[str]] = {}
+        self._ids: dict[str, int] = {}
+        self._names: list[str] = []
+        self._desc_bits: dict[str, int] = {}
+        self._restart_cache: dict[frozenset[str], frozenset[str]] = {}
 
     def add(self, parent: str, children: list[str]) -> None:
-        """Register a parent and its direct children, then recompute descendants."""
-        self._children.setdefault(parent, set()).update(children)
-        self._recompute()
+        """Register a parent and its direct children, then update descendants.
 
-    def get_children(self, deployment: str) -> set[str]:
+        Only the parent and its ancestors can gain descendants, so the update
+        walks up the reverse index instead of recomputing every node.
+        """
+        self._children[parent] = self._children.get(parent, frozenset()).union(children)
+        for child in children:
+            self._parents.setdefault(child, set()).add(parent)
+        self._restart_cache.clear()
+
+        new_bits = 0
+        for child in children:
+            new_bits |= self._bit(child) | self._desc_bits.get(child, 0)
+
+        pending = deque([parent])
+        while pending:
+            node = pending.popleft()
+            current = self._desc_bits.get(node, 0)
+            if not new_bits & ~current:
+                continue
+            self._desc_bits[node] = current | new_bits
+            pending.extend(self._parents.get(node, ()))
+
+    def set_parent(self, child: str, parent: str | None) -> None:
+        """Make parent the only parent of child, or detach child if parent is None.
+
+        Former parents and their ancestors are recomputed from their remaining
+        children; the rest of the tree is left untouched.
+        """
+        former = self._parents.pop(child, set()) - {parent}
+        for old_parent in former:
+            siblings = self._children[old_parent] - {child}
+            if siblings:
+                self._children[old_parent] = siblings
+            else:
+                del self._children[old_parent]
+        if parent is not None:
+            self.add(parent, [child])
+        for old_parent in former:
+            self._refresh(old_parent)
+        self._restart_cache.clear()
+
+    def get_children(self, deployment: str) -> frozenset[str]:
         """Return direct children of a deployment."""
-        return set(self._children.get(deployment, set()))
+        return self._children.get(deployment, frozenset())
 
     def get_descendants(self, deployment: str) -> frozenset[str]:
         """Return all transitive descendants of a deployment (pre-computed)."""
-        return self._descendants.get(deployment, frozenset())
+        return frozenset(self._decode(self._desc_bits.get(deployment, 0)))
 
     def compute_restart_set(self, triggers: set[str]) -> set[str]:
         """Compute the deduplicated set of deployments to restart.
 
         A triggered deployment causes all its descendants to restart.
         Descendants that are themselves triggers are excluded (they already restarted).
+        Results are cached per set of triggers until the tree changes.
 
         Args:
             triggers: Set of deployment names that triggered a restart.
@@ -46,28 +94,52 @@ class DependencyTree:
         Returns:
             Set of deployment names that should be restarted.
         """
-        to_restart: set[str] = set()
-        for trigger in triggers:
-            to_restart.update(self.get_descendants(trigger) - triggers)
-
-        self._logger.debug("Triggers: %s -> restart set: %s", triggers, to_restart)
+        key = frozenset(triggers)
+        cached = self._restart_cache.get(key)
+        if cached is not None:
+            return set(cached)
+
+        restart_bits = functools.reduce(operator.or_, (self._desc_bits.get(t, 0) for t in triggers), 0)
+        if restart_bits:
+            # Only nodes that are someone's child have a bit; others cannot be descendants.
+            trigger_bits = functools.reduce(operator.or_, (1 << self._ids[t] for t in triggers if t in self._ids), 0)
+            restart_bits &= ~trigger_bits
+        to_restart = self._decode(restart_bits)
+        self._restart_cache[key] = frozenset(to_restart)
+
+        if self._logger.isEnabledFor(logging.DEBUG):
+            self._logger.debug("Triggers: %s -> restart set: %s", triggers, to_restart)
         return to_restart
 
-    def _recompute(self) -> None:
-        """Pre-compute descendants for every known node."""
-        self._descendants.clear()
-        all_nodes: set[str] = set()
-        for parent, children in self._children.items():
-            all_nodes.add(parent)
-            all_nodes.update(children)
-        for node in all_nodes:
-            self._descendants[node] = self._collect_descendants(node)
-
-    def _collect_descendants(self, node: str) -> frozenset[str]:
-        if node in self._descendants:
-            return self._descendants[node]
-        result: set[str] = set()
-        for child in self._children.get(node, []):
-            result.add(child)
-            result.update(self._collect_descendants(child))
-        return frozenset(result)
+    def _refresh(self, node: str) -> None:
+        """Recompute descendants of a node from its children, then of its ancestors."""
+        pending = deque([node])
+        while pending:
+            current = pending.popleft()
+            bits = 0
+            for child in self._children.get(current, ()):
+                bits |= self._bit(child) | self._desc_bits.get(child, 0)
+            if bits == self._desc_bits.get(current, 0):
+                continue
+            if bits:
+                self._desc_bits[current] = bits
+            else:
+                del self._desc_bits[current]
+            pending.extend(self._parents.get(current, ()))
+
+    def _bit(self, deployment: str) -> int:
+        """Return the bit identifying a deployment, assigning a new one if needed."""
+        node_id = self._ids.get(deployment)
+        if node_id is None:
+            node_id = self._ids[deployment] = len(self._names)
+            self._names.append(deployment)
+        return 1 << node_id
+
+    def _decode(self, bits: int) -> set[str]:
+        """Return the deployment names whose bits are set in a mask."""
+        names: set[str] = set()
+        while bits:
+            lowest = bits & -bits
+            names.add(self._names[lowest.bit_length() - 1])
+            bits ^= lowest
+        return names
@@ -0,0 +1,96 @@
+"""Watches deployments and keeps a local cache of their parent annotations.
+
+The cache is seeded by a single LIST and then kept current by the watch stream,
+so readers never need to query the API server.
+"""
+
+from __future__ import annotations
+
+import threading
+from typing import Callable
+
+from kubernetes import client
+
+from .watcher import Watcher
+
+
+class DeploymentWatcher(Watcher):
+    """Maintains an in-memory map of deployment name to parent name.
+
+    Only the parent annotation is retained, not the deployment objects whose
+    pod templates make up most of their size. Notifies on_change with the
+    deployment name whenever its parent changes, including when the deployment
+    is added or deleted.
+    """
+
+    def __init__(
+        self,
+        namespace: str,
+        on_change: Callable[[str], None],
+        apps_api: client.AppsV1Api | None = None,
+    ) -> None:
+        super().__init__(namespace, on_change)
+        self._apps_api = apps_api or client.AppsV1Api()
+        self._parents: dict[str, str | None] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def _list_func(self) -> Callable[..., object]:
+        return self._apps_api.list_namespaced_deployment
+
+    @property
+    def parents(self) -> dict[str, str | None]:
+        """Return a snapshot of the parent of every cached deployment."""
+        with self._lock:
+            return dict(self._parents)
+
+    def get_parent(self, deployment_name: str) -> str | None:
+        """Return the cached parent of a deployment, or None if it has none."""
+        with self._lock:
+            return self._parents.get(deployment_name)
+
+    def sync(self) -> None:
+        """Seed the cache with a single LIST served from the API server cache.
+
+        When the cache was already seeded (relisting after the watch expired),
+        on_change is notified of every deployment whose parent changed meanwhile,
+        including deployments deleted in between.
+        """
+        resyncing = self._last_rv != self.CACHED_RESOURCE_VERSION
+        deployments = self._apps_api.list_namespaced_deployment(
+            self._namespace,
+            resource_version=self.CACHED_RESOURCE_VERSION,
+            resource_version_match="NotOlderThan",
+        )
+        parents = {dep.metadata.name: self._parent_annotation(dep) for dep in deployments.items}
+        with self._lock:
+            previous, self._parents = self._parents, parents
+        # Resume the watch from the listed state rather than replaying it.
+        self._last_rv = deployments.metadata.resource_version
+        self._logger.info("Cached %d deployments", len(parents))
+
+        if resyncing:
+            for name in previous.keys() | parents.keys():
+                if previous.get(name) != parents.get(name):
+                    self._on_change(name)
+
+    def _process_event(self, event: dict) -> None:
+        event_type = event["type"]
+        deployment = event["object"]
+        name = deployment.metadata.name
+
+        with self._lock:
+            if event_type == "DELETED":
+                old_parent = self._parents.pop(name, None)
+                new_parent = None
+            else:
+                old_parent = self._parents.get(name)
+                new_parent = self._parents[name] = self._parent_annotation(deployment)
+
+        if old_parent != new_parent:
+            self._logger.debug("Deployment %s parent: %s -> %s", name, old_parent, new_parent)
+            self._on_change(name)
+
+    def _parent_annotation(self, deployment: object) -> str | None:
+        """Return the parent annotation of a deployment, if any."""
+        return self._get_annotations(deployment).get(self.ANNOTATION_PARENT)
@@ -3,13 +3,18 @@
 Console (stderr): INFO and above.
 File: DEBUG and above, with rotation.
 Format: ISO 8601 timestamp, logger name, message.
+
+Records are queued by the calling thread and written by a background
+listener thread, so callers never block on console or disk I/O.
 """
 
 from __future__ import annotations
 
+import atexit
 import logging
+import queue
 import sys
-from logging.handlers import RotatingFileHandler
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 
 LOG_FORMAT = "%(asctime)s [%(levelname)s] (%(name)s) - %(message)s"
 LOG_DATEFMT = "%Y-%m-%dT%H:%M:%S%z"
@@ -21,6 +26,9 @@ LOG_BACKUP_COUNT = 3
 def setup_logging(log_file: str | None = LOG_FILE) -> None:
     """Configure logging with stderr and optional file handlers.
 
+    The handlers run on a QueueListener thread that is stopped, flushing
+    pending records, at interpreter exit.
+
     Args:
         log_file: Path to the log file. Pass None to disable file logging.
     """
@@ -33,10 +41,16 @@ def setup_logging(log_file: str | None = LOG_FILE) -> None:
     stderr_handler = logging.StreamHandler(sys.stderr)
     stderr_handler.setLevel(logging.INFO)
     stderr_handler.setFormatter(formatter)
-    root.addHandler(stderr_handler)
+    handlers: list[logging.Handler] = [stderr_handler]
 
     if log_file is not None:
         file_handler = RotatingFileHandler(log_file, maxBytes=LOG_MAX_BYTES, backupCount=LOG_BACKUP_COUNT)
         file_handler.setLevel(logging.DEBUG)
         file_handler.setFormatter(formatter)
-        root.addHandler(file_handler)
+        handlers.append(file_handler)
+
+    log_queue: queue.SimpleQueue[logging.LogRecord] = queue.SimpleQueue()
+    root.addHandler(QueueHandler(log_queue))
+    listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+    listener.start()
+    atexit.register(listener.stop)
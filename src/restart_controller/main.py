@@ -1,91 +1,161 @@
 """Entry point and coordinator for the restart controller.
 
 Loads kubeconfig, builds the dependency tree from deployment annotations,
-starts watchers, and orchestrates cascading restarts.
+keeps it up to date from deployment events, starts watchers, and
+orchestrates cascading restarts.
 """
 
 from __future__ import annotations
 
 import logging
+import queue
 import signal
 import sys
 import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 
 from kubernetes import client, config
 
 from .dependency_tree import DependencyTree
+from .deployment_watcher import DeploymentWatcher
 from .logging_config import setup_logging
 from .pod_watcher import PodWatcher
+from .replica_set_watcher import ReplicaSetWatcher
 from .restart_manager import RestartManager
-from .watcher import Watcher
 
 
 class Controller:
     """Coordinates watchers and restart manager to cascade restarts."""
 
     DEFAULT_NAMESPACE = "default"
-
-    def __init__(self, namespace: str, apps_api: client.AppsV1Api, core_api: client.CoreV1Api) -> None:
+    PATCH_WORKERS = 16
+    DEBOUNCE = 0.5
+
+    def __init__(
+        self,
+        namespace: str,
+        apps_api: client.AppsV1Api,
+        core_api: client.CoreV1Api,
+        pod_label_selector: str | None = None,
+    ) -> None:
         self._logger = logging.getLogger(type(self).__name__)
         self._namespace = namespace
-        self._apps_api = apps_api
         self._restart_mgr = RestartManager(namespace, apps_api)
-        self._pod_watcher = PodWatcher(namespace, self._on_change, apps_api=apps_api, core_api=core_api)
+        self._patch_pool = ThreadPoolExecutor(max_workers=self.PATCH_WORKERS, thread_name_prefix="restart")
+        self._changes: queue.Queue[str] = queue.Queue()
+        self._tree = DependencyTree()
+        self._tree_lock = threading.Lock()
+        self._deployment_watcher = DeploymentWatcher(namespace, self._on_dependency_change, apps_api=apps_api)
+        self._replica_set_watcher = ReplicaSetWatcher(namespace, apps_api=apps_api)
+        self._pod_watcher = PodWatcher(
+            namespace,
+            self._on_change,
+            apps_api=apps_api,
+            core_api=core_api,
+            label_selector=pod_label_selector,
+            replica_sets=self._replica_set_watcher,
+        )
 
     def build_tree(self) -> DependencyTree:
-        """Build the dependency tree by reading annotations from all deployments."""
+        """Build the dependency tree from the cached parent annotations."""
         tree = DependencyTree()
-        deployments = self._apps_api.list_namespaced_deployment(self._namespace)
 
         children_by_parent: dict[str, list[str]] = {}
-        for dep in deployments.items:
-            annotations = dep.metadata.annotations or {}
-            parent = annotations.get(Watcher.ANNOTATION_PARENT)
+        for name, parent in self._deployment_watcher.parents.items():
             if parent:
-                children_by_parent.setdefault(parent, []).append(dep.metadata.name)
+                children_by_parent.setdefault(parent, []).append(name)
 
         for parent, children in children_by_parent.items():
             tree.add(parent, children)
 
-        self._logger.info("Built dependency tree: %s", {p: list(c) for p, c in children_by_parent.items()})
+        if self._logger.isEnabledFor(logging.INFO):
+            self._logger.info("Built dependency tree: %s", {p: list(c) for p, c in children_by_parent.items()})
         return tree
 
     def _on_change(self, deployment_name: str) -> None:
-        """Handle a deployment change event: rebuild tree and cascade restarts."""
-        self._logger.info("Handling change for deployment %s", deployment_name)
-        tree = self.build_tree()
-        restart_set = tree.compute_restart_set({deployment_name})
+        """Queue a deployment change event; changes are handled in batches."""
+        self._changes.put(deployment_name)
+
+    def _next_batch(self) -> set[str]:
+        """Wait for a change, then coalesce the changes received within DEBOUNCE seconds."""
+        batch = {self._changes.get()}
+        deadline = time.monotonic() + self.DEBOUNCE
+        while (remaining := deadline - time.monotonic()) > 0:
+            try:
+                batch.add(self._changes.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _handle_changes(self, deployment_names: set[str]) -> None:
+        """Handle a batch of changed deployments: cascade restarts to their descendants."""
+        self._logger.info("Handling changes for deployments %s", deployment_names)
+        with self._tree_lock:
+            restart_set = self._tree.compute_restart_set(deployment_names)
 
         if not restart_set:
-            self._logger.info("No children to restart for %s", deployment_name)
+            self._logger.info("No children to restart for %s", deployment_names)
             return
 
-        reason = f"parent {deployment_name} changed"
+        reason = f"parent {', '.join(sorted(deployment_names))} changed"
         self._logger.info("Restarting %d deployments: %s", len(restart_set), restart_set)
-        for dep in restart_set:
-            self._restart_mgr.restart(dep, reason)
-
-    def run(self) -> None:
-        """Start watcher thread and wait for shutdown signal."""
-        stop = threading.Event()
+        list(self._patch_pool.map(lambda dep: self._restart_mgr.restart(dep, reason), restart_set))
 
-        def shutdown(signum: int, frame: object) -> None:
-            self._logger.info("Received signal %d, shutting down", signum)
-            stop.set()
+    def _process_changes(self) -> None:
+        """Handle queued changes batch by batch, indefinitely."""
+        while True:
+            self._handle_changes(self._next_batch())
 
-        signal.signal(signal.SIGTERM, shutdown)
-        signal.signal(signal.SIGINT, shutdown)
+    def _on_dependency_change(self, deployment_name: str) -> None:
+        """Apply a parent annotation change reported by the deployment watcher to the tree."""
+        parent = self._deployment_watcher.get_parent(deployment_name)
+        self._logger.info("Parent of deployment %s is now %s", deployment_name, parent)
+        with self._tree_lock:
+            self._tree.set_parent(deployment_name, parent)
 
+    def run(self) -> None:
+        """Start watcher threads and wait for shutdown signal."""
+        shutdown_signals = {signal.SIGTERM, signal.SIGINT}
+        # Block before starting threads: they inherit the mask, so only sigwait() receives the signals.
+        signal.pthread_sigmask(signal.SIG_BLOCK, shutdown_signals)
+
+        self._deployment_watcher.sync()
+        self._replica_set_watcher.sync()
+        with self._tree_lock:
+            self._tree = self.build_tree()
+        change_thread = threading.Thread(
+            target=self._process_changes,
+            daemon=True,
+            name="change-handler",
+        )
+        deployment_thread = threading.Thread(
+            target=self._deployment_watcher.watch,
+            daemon=True,
+            name="deployment-watcher",
+        )
+        replica_set_thread = threading.Thread(
+            target=self._replica_set_watcher.watch,
+            daemon=True,
+            name="replica-set-watcher",
+        )
         pod_thread = threading.Thread(
             target=self._pod_watcher.watch,
             daemon=True,
             name="pod-watcher",
         )
 
+        change_thread.start()
+        deployment_thread.start()
+        self._logger.info("Deployment watcher started")
+        replica_set_thread.start()
+        self._logger.info("ReplicaSet watcher started")
         pod_thread.start()
         self._logger.info("Pod watcher started")
 
-        stop.wait()
+        signum = signal.sigwait(shutdown_signals)
+        self._logger.info("Received signal %d, shutting down", signum)
+        self._patch_pool.shutdown(wait=True)
         self._logger.info("Controller stopped")
 
 
@@ -93,6 +163,7 @@ def main() -> None:
     setup_logging()
 
     namespace = sys.argv[1] if len(sys.argv) > 1 else Controller.DEFAULT_NAMESPACE
+    pod_label_selector = sys.argv[2] if len(sys.argv) > 2 else None
 
     try:
         config.load_incluster_config()
@@ -102,7 +173,7 @@ def main() -> None:
     apps_api = client.AppsV1Api()
     core_api = client.CoreV1Api()
 
-    controller = Controller(namespace, apps_api, core_api)
+    controller = Controller(namespace, apps_api, core_api, pod_label_selector)
     controller.run()
 
 
@@ -2,36 +2,52 @@
 
 from __future__ import annotations
 
+import operator
 from typing import Callable
 
 from kubernetes import client
 
+from .replica_set_watcher import ReplicaSetWatcher
 from .watcher import Watcher
 
 
 class PodWatcher(Watcher):
     """Detects pod container restarts and resolves the owning deployment.
 
-    Uses a ReplicaSet-to-Deployment cache to avoid redundant API lookups.
+    Resolves deployments through a ReplicaSetWatcher cache to avoid API lookups.
+    An optional label selector restricts the watch on the API server side to
+    pods of the deployments that matter.
     """
 
+    _GET_RESTART_COUNT = operator.attrgetter("restart_count")
+
     def __init__(
         self,
         namespace: str,
         on_change: Callable[[str], None],
         apps_api: client.AppsV1Api | None = None,
         core_api: client.CoreV1Api | None = None,
+        label_selector: str | None = None,
+        replica_sets: ReplicaSetWatcher | None = None,
     ):
         super().__init__(namespace, on_change)
         self._apps_api = apps_api or client.AppsV1Api()
         self._core_api = core_api or client.CoreV1Api()
+        self._label_selector = label_selector
+        self._replica_sets = replica_sets or ReplicaSetWatcher(namespace, apps_api=self._apps_api)
         self._restart_counts: dict[str, int] = {}
-        self._rs_to_deployment: dict[str, str | None] = {}
 
     @property
     def _list_func(self) -> Callable[..., object]:
+        # Kept as the bound API method: Watch infers the event object type from it.
         return self._core_api.list_namespaced_pod
 
+    @property
+    def _watch_kwargs(self) -> dict[str, object]:
+        if self._label_selector is None:
+            return {}
+        return {"label_selector": self._label_selector}
+
     def _process_event(self, event: dict) -> None:
         event_type = event["type"]
         pod = event["object"]
@@ -52,7 +68,7 @@ class PodWatcher(Watcher):
         if not pod.status or not pod.status.container_statuses:
             return
 
-        total_restarts = sum(cs.restart_count for cs in pod.status.container_statuses)
+        total_restarts = sum(map(self._GET_RESTART_COUNT, pod.status.container_statuses))
         prev = self._restart_counts.get(pod_name, 0)
         self._restart_counts[pod_name] = total_restarts
 
@@ -69,22 +85,10 @@ class PodWatcher(Watcher):
                 self._on_change(deployment_name)
 
     def _resolve_deployment(self, pod: object) -> str | None:
-        """Resolve the owning deployment name for a pod via its ReplicaSet owner.
-
-        Results are cached by ReplicaSet name since all pods from the same
-        ReplicaSet belong to the same Deployment.
-        """
+        """Resolve the owning deployment name for a pod via its ReplicaSet owner."""
         for owner in pod.metadata.owner_references or []:
             if owner.kind == "ReplicaSet":
-                if owner.name in self._rs_to_deployment:
-                    return self._rs_to_deployment[owner.name]
-                try:
-                    rs = self._apps_api.read_namespaced_replica_set(owner.name, self._namespace)
-                    for rs_owner in rs.metadata.owner_references or []:
-                        if rs_owner.kind == "Deployment":
-                            self._rs_to_deployment[owner.name] = rs_owner.name
-                            return rs_owner.name
-                    self._rs_to_deployment[owner.name] = None
-                except client.ApiException:
-                    self._logger.warning("Failed to look up ReplicaSet %s", owner.name)
+                deployment_name = self._replica_sets.get_deployment(owner.name)
+                if deployment_name:
+                    return deployment_name
         return None
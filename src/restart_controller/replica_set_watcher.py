@@ -0,0 +1,76 @@
+"""Watches ReplicaSets to resolve their owning deployment locally.
+
+The cache is seeded by a single LIST and then kept current by the watch stream,
+so resolving a pod's deployment does not require an API call per ReplicaSet.
+"""
+
+from __future__ import annotations
+
+import threading
+from typing import Callable
+
+from kubernetes import client
+
+from .watcher import Watcher
+
+
+class ReplicaSetWatcher(Watcher):
+    """Maintains an in-memory map of ReplicaSet name to owning deployment name.
+
+    ReplicaSets not seen yet (created after the last event received) are looked
+    up once through the API and cached.
+    """
+
+    def __init__(self, namespace: str, apps_api: client.AppsV1Api | None = None) -> None:
+        super().__init__(namespace)
+        self._apps_api = apps_api or client.AppsV1Api()
+        self._rs_to_deployment: dict[str, str | None] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def _list_func(self) -> Callable[..., object]:
+        return self._apps_api.list_namespaced_replica_set
+
+    def sync(self) -> None:
+        """Seed the cache with a single LIST served from the API server cache."""
+        replica_sets = self._apps_api.list_namespaced_replica_set(
+            self._namespace,
+            resource_version=self.CACHED_RESOURCE_VERSION,
+            resource_version_match="NotOlderThan",
+        )
+        with self._lock:
+            self._rs_to_deployment = {rs.metadata.name: self._owner_deployment(rs) for rs in replica_sets.items}
+        # Resume the watch from the listed state rather than replaying it.
+        self._last_rv = replica_sets.metadata.resource_version
+        self._logger.info("Cached %d replica sets", len(self._rs_to_deployment))
+
+    def get_deployment(self, rs_name: str) -> str | None:
+        """Return the name of the deployment owning a ReplicaSet, or None if there is none."""
+        with self._lock:
+            if rs_name in self._rs_to_deployment:
+                return self._rs_to_deployment[rs_name]
+        try:
+            rs = self._apps_api.read_namespaced_replica_set(rs_name, self._namespace)
+        except client.ApiException:
+            self._logger.warning("Failed to look up ReplicaSet %s", rs_name)
+            return None
+        deployment_name = self._owner_deployment(rs)
+        with self._lock:
+            self._rs_to_deployment[rs_name] = deployment_name
+        return deployment_name
+
+    def _process_event(self, event: dict) -> None:
+        rs = event["object"]
+        with self._lock:
+            if event["type"] == "DELETED":
+                self._rs_to_deployment.pop(rs.metadata.name, None)
+            else:
+                self._rs_to_deployment[rs.metadata.name] = self._owner_deployment(rs)
+
+    @staticmethod
+    def _owner_deployment(rs: object) -> str | None:
+        """Return the name of the Deployment listed in a ReplicaSet's owner references."""
+        for owner in rs.metadata.owner_references or []:
+            if owner.kind == "Deployment":
+                return owner.name
+        return None
@@ -7,8 +7,9 @@ to prevent restart loops.
 from __future__ import annotations
 
 import logging
+import threading
 import time
-from datetime import datetime, timezone
+from collections import OrderedDict
 
 from kubernetes import client
 
@@ -27,14 +28,17 @@ class RestartManager:
         self._logger = logging.getLogger(type(self).__name__)
         self._namespace = namespace
         self._apps_api = apps_api or client.AppsV1Api()
-        self._last_restart: dict[str, float] = {}
+        # Ordered oldest restart first, so expired entries are popped from the front.
+        self._last_restart: OrderedDict[str, float] = OrderedDict()
+        self._lock = threading.Lock()
 
     def restart(self, deployment_name: str, reason: str) -> bool:
         """Trigger a rollout restart for a deployment.
 
         Sets restart-controller annotations on the pod template to force
         Kubernetes to roll out new pods. Skips if the deployment was recently
-        restarted (within COOLDOWN seconds).
+        restarted (within COOLDOWN seconds). Safe to call from several threads:
+        the cooldown slot is claimed atomically before patching.
 
         Args:
             deployment_name: Name of the deployment to restart.
@@ -44,16 +48,20 @@ class RestartManager:
             True if restart was triggered, False if skipped due to cooldown.
         """
         now = time.monotonic()
-        last = self._last_restart.get(deployment_name, 0.0)
-        if now - last < self.COOLDOWN:
-            self._logger.debug(
-                "Skipping restart of %s (restarted %.1fs ago)",
-                deployment_name,
-                now - last,
-            )
-            return False
+        with self._lock:
+            self._expire(now)
+            last = self._last_restart.get(deployment_name)
+            if last is not None and now - last < self.COOLDOWN:
+                self._logger.debug(
+                    "Skipping restart of %s (restarted %.1fs ago)",
+                    deployment_name,
+                    now - last,
+                )
+                return False
+            self._last_restart[deployment_name] = now
+            self._last_restart.move_to_end(deployment_name)
 
-        timestamp = datetime.now(timezone.utc).isoformat()
+        timestamp = self._timestamp()
         patch = {
             "spec": {
                 "template": {
@@ -69,7 +77,6 @@ class RestartManager:
 
         try:
             self._apps_api.patch_namespaced_deployment(deployment_name, self._namespace, patch)
-            self._last_restart[deployment_name] = now
             self._logger.info(
                 "Restarted deployment %s (reason=%s)",
                 deployment_name,
@@ -77,5 +84,20 @@ class RestartManager:
             )
             return True
         except client.ApiException as e:
+            with self._lock:
+                # Any previous restart is past its cooldown, so forgetting it is equivalent.
+                if self._last_restart.get(deployment_name) == now:
+                    del self._last_restart[deployment_name]
             self._logger.error("Failed to restart deployment %s: %s", deployment_name, e)
             return False
+
+    @staticmethod
+    def _timestamp() -> str:
+        """Return the current UTC time as an ISO 8601 string with microseconds."""
+        seconds, nanos = divmod(time.time_ns(), 1_000_000_000)
+        return f"{time.strftime('%Y-%m-%dT%H:%M:%S', time.gmtime(seconds))}.{nanos // 1000:06d}Z"
+
+    def _expire(self, now: float) -> None:
+        """Drop cooldown entries older than COOLDOWN. Caller must hold the lock."""
+        while self._last_restart and now - next(iter(self._last_restart.values())) >= self.COOLDOWN:
+            self._last_restart.popitem(last=False)
@@ -8,12 +8,15 @@ from __future__ import annotations
 
 import logging
 from abc import ABC, abstractmethod
+from http import HTTPStatus
 from typing import Callable
 
-from kubernetes import watch
+from kubernetes import client, watch
 
 import restart_controller
 
+from .restart_manager import RestartManager
+
 
 class Watcher(ABC):
     """Base class for Kubernetes event watchers.
@@ -23,27 +26,84 @@ class Watcher(ABC):
     """
 
     ANNOTATION_PARENT = f"{restart_controller.ANNOTATION_PREFIX}parent"
+    _RESTART_KEYS = frozenset(
+        {
+            ANNOTATION_PARENT,
+            RestartManager.ANNOTATION_LAST_RESTART,
+            RestartManager.ANNOTATION_REASON,
+        }
+    )
+
+    WATCH_TIMEOUT = 300
+    # "0" lets the API server answer from its watch cache instead of etcd.
+    CACHED_RESOURCE_VERSION = "0"
+
+    def __init__(self, namespace: str, on_change: Callable[[str], None] | None = None) -> None:
+        """Initialize the watcher.
 
-    def __init__(self, namespace: str, on_change: Callable[[str], None]) -> None:
+        Args:
+            namespace: Namespace to watch.
+            on_change: Callback notified with a deployment name. None for watchers
+                that only maintain a cache.
+        """
         self._logger = logging.getLogger(type(self).__name__)
         self._namespace = namespace
         self._on_change = on_change
+        self._last_rv = self.CACHED_RESOURCE_VERSION
 
     @property
     @abstractmethod
     def _list_func(self) -> Callable[..., object]:
         """Return the K8s API list function to stream."""
 
+    @property
+    def _watch_kwargs(self) -> dict[str, object]:
+        """Return extra keyword arguments for the list function, such as selectors."""
+        return {}
+
     @abstractmethod
     def _process_event(self, event: dict) -> None:
         """Process a single watch event."""
 
+    def sync(self) -> None:
+        """Start the next watch from the API server cache.
+
+        Watchers keeping a cache override this to relist it and resume the watch
+        from the listed resource version.
+        """
+        self._last_rv = self.CACHED_RESOURCE_VERSION
+
     def watch(self) -> None:
-        """Run the watch loop indefinitely, delegating events to _process_event."""
-        w = watch.Watch()
+        """Run the watch loop indefinitely, delegating events to _process_event.
+
+        Each stream ends after WATCH_TIMEOUT seconds and is resumed from the last
+        resource version seen, kept fresh by bookmark events. If that version has
+        expired (410 Gone), the events in between are lost, so the watcher syncs
+        again before watching.
+        """
         self._logger.info("Starting %s on namespace %s", type(self).__name__, self._namespace)
-        for event in w.stream(self._list_func, namespace=self._namespace):
-            self._process_event(event)
+        while True:
+            w = watch.Watch()
+            try:
+                for event in w.stream(
+                    self._list_func,
+                    namespace=self._namespace,
+                    resource_version=self._last_rv,
+                    allow_watch_bookmarks=True,
+                    timeout_seconds=self.WATCH_TIMEOUT,
+                    **self._watch_kwargs,
+                ):
+                    if event["type"] == "BOOKMARK":
+                        # Read from the raw event: clients before 36 do not track bookmark versions.
+                        self._last_rv = event["raw_object"]["metadata"]["resourceVersion"]
+                    else:
+                        self._process_event(event)
+                        self._last_rv = w.resource_version or self._last_rv
+            except client.ApiException as e:
+                if e.status != HTTPStatus.GONE:
+                    raise
+                self._logger.warning("Resource version %s expired, syncing again", self._last_rv)
+                self.sync()
 
     @staticmethod
     def _get_annotations(obj: object) -> dict[str, str]:
@@ -53,7 +113,7 @@ class Watcher(ABC):
             return {}
         return metadata.annotations or {}
 
-    @staticmethod
-    def _has_restart_annotations(annotations: dict[str, str]) -> bool:
-        """Check if annotations contain any restart-controller keys."""
-        return any(k.startswith(restart_controller.ANNOTATION_PREFIX) for k in annotations)
+    @classmethod
+    def _has_restart_annotations(cls, annotations: dict[str, str]) -> bool:
+        """Check if annotations contain any of the restart-controller keys."""
+        return not cls._RESTART_KEYS.isdisjoint(annotations.keys())
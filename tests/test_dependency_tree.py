@@ -1,5 +1,7 @@
 """Tests for DependencyTree."""
 
+import sys
+
 from restart_controller.dependency_tree import DependencyTree
 
 
@@ -28,6 +30,13 @@ class TestAdd:
         tree.add("b", ["c"])
         assert tree.get_descendants("a") == frozenset({"b", "c"})
 
+    def test_add_parent_after_child(self):
+        tree = DependencyTree()
+        tree.add("b", ["c"])
+        tree.add("a", ["b"])
+        assert tree.get_descendants("a") == frozenset({"b", "c"})
+        assert tree.get_descendants("b") == frozenset({"c"})
+
     def test_duplicate_children_ignored(self):
         tree = DependencyTree()
         tree.add("a", ["b", "b", "c"])
@@ -40,6 +49,56 @@ class TestAdd:
         assert tree.get_children("anything") == set()
 
 
+class TestSetParent:
+    def test_attaches_child(self):
+        tree = DependencyTree()
+        tree.add("b", ["c"])
+        tree.set_parent("b", "a")
+        assert tree.get_children("a") == {"b"}
+        assert tree.get_descendants("a") == frozenset({"b", "c"})
+
+    def test_detaches_child(self):
+        tree = DependencyTree()
+        tree.add("a", ["b"])
+        tree.add("b", ["c"])
+        tree.set_parent("b", None)
+        assert tree.get_children("a") == set()
+        assert tree.get_descendants("a") == frozenset()
+        assert tree.get_descendants("b") == frozenset({"c"})
+
+    def test_moves_child(self):
+        #   r          r
+        #  / \        /
+        # a   x  ->  a
+        # |   |      |
+        # b   y      b
+        #            |
+        #            y
+        tree = DependencyTree()
+        tree.add("r", ["a", "x"])
+        tree.add("a", ["b"])
+        tree.add("x", ["y"])
+        tree.set_parent("y", "b")
+        tree.set_parent("x", None)
+        assert tree.get_descendants("r") == frozenset({"a", "b", "y"})
+        assert tree.get_descendants("x") == frozenset()
+        assert tree.get_descendants("a") == frozenset({"b", "y"})
+
+    def test_same_parent_is_noop(self):
+        tree = DependencyTree()
+        tree.add("a", ["b"])
+        tree.set_parent("b", "a")
+        assert tree.get_children("a") == {"b"}
+        assert tree.get_descendants("a") == frozenset({"b"})
+
+    def test_invalidates_cached_restart_set(self):
+        tree = DependencyTree()
+        tree.add("a", ["b"])
+        assert tree.compute_restart_set({"a"}) == {"b"}
+        tree.set_parent("b", None)
+        assert tree.compute_restart_set({"a"}) == set()
+
+
 class TestGetDescendants:
     def test_leaf_node(self):
         tree = DependencyTree()
@@ -69,6 +128,41 @@ class TestGetDescendants:
         tree.add("b", ["d"])
         assert tree.get_descendants("a") == frozenset({"b", "c", "d"})
 
+    def test_diamond(self):
+        #     a
+        #    / \
+        #   b   c
+        #    \ /
+        #     d
+        #     |
+        #     e
+        tree = DependencyTree()
+        tree.add("a", ["b", "c"])
+        tree.add("b", ["d"])
+        tree.add("c", ["d"])
+        tree.add("d", ["e"])
+        assert tree.get_descendants("a") == frozenset({"b", "c", "d", "e"})
+        assert tree.get_descendants("b") == frozenset({"d", "e"})
+        assert tree.get_descendants("c") == frozenset({"d", "e"})
+
+    def test_stacked_diamonds(self):
+        # Each layer fans out to two nodes that join again in the next layer.
+        tree = DependencyTree()
+        depth = 30
+        for i in range(depth):
+            tree.add(f"j{i}", [f"l{i}", f"r{i}"])
+            tree.add(f"l{i}", [f"j{i + 1}"])
+            tree.add(f"r{i}", [f"j{i + 1}"])
+        assert len(tree.get_descendants("j0")) == 3 * depth
+
+    def test_chain_deeper_than_recursion_limit(self):
+        depth = sys.getrecursionlimit() + 100
+        tree = DependencyTree()
+        for i in reversed(range(depth)):
+            tree.add(f"n{i}", [f"n{i + 1}"])
+        assert len(tree.get_descendants("n0")) == depth
+        assert tree.compute_restart_set({f"n{depth - 1}"}) == {f"n{depth}"}
+
     def test_subtree(self):
         tree = DependencyTree()
         tree.add("a", ["b", "c"])
@@ -127,3 +221,17 @@ class TestComputeRestartSet:
         tree = DependencyTree()
         tree.add("a", ["b"])
         assert tree.compute_restart_set(set()) == set()
+
+    def test_repeated_call_returns_same_result(self):
+        tree = DependencyTree()
+        tree.add("a", ["b"])
+        first = tree.compute_restart_set({"a"})
+        first.add("mutated")
+        assert tree.compute_restart_set({"a"}) == {"b"}
+
+    def test_add_invalidates_cached_result(self):
+        tree = DependencyTree()
+        tree.add("a", ["b"])
+        assert tree.compute_restart_set({"a"}) == {"b"}
+        tree.add("b", ["c"])
+        assert tree.compute_restart_set({"a"}) == {"b", "c"}
@@ -0,0 +1,107 @@
+"""Tests for DeploymentWatcher."""
+
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+from kubernetes.client import AppsV1Api
+
+from restart_controller.deployment_watcher import DeploymentWatcher
+from restart_controller.watcher import Watcher
+
+NAMESPACE = "test-ns"
+
+
+def _make_deployment(name: str, parent: str | None = None):
+    """Create a fake deployment object."""
+    annotations = {Watcher.ANNOTATION_PARENT: parent} if parent else None
+    return SimpleNamespace(metadata=SimpleNamespace(name=name, annotations=annotations))
+
+
+def _make_watcher(deployments: list | None = None):
+    """Create a DeploymentWatcher with a mocked API and a seeded cache."""
+    mock_apps = MagicMock(spec_set=AppsV1Api)
+    mock_apps.list_namespaced_deployment.return_value.items = deployments or []
+    cb = MagicMock()
+    watcher = DeploymentWatcher(NAMESPACE, cb, apps_api=mock_apps)
+    watcher.sync()
+    return watcher, cb, mock_apps
+
+
+class TestSync:
+    def test_seeds_cache_from_list(self):
+        db = _make_deployment("db")
+        api = _make_deployment("api", parent="db")
+        watcher, cb, _ = _make_watcher([db, api])
+
+        assert watcher.parents == {"db": None, "api": "db"}
+        cb.assert_not_called()
+
+    def test_lists_from_api_server_cache(self):
+        _, _, mock_apps = _make_watcher()
+
+        mock_apps.list_namespaced_deployment.assert_called_once_with(
+            NAMESPACE,
+            resource_version="0",
+            resource_version_match="NotOlderThan",
+        )
+
+    def test_watch_resumes_from_listed_version(self):
+        mock_apps = MagicMock(spec_set=AppsV1Api)
+        mock_apps.list_namespaced_deployment.return_value.items = []
+        mock_apps.list_namespaced_deployment.return_value.metadata.resource_version = "42"
+        watcher = DeploymentWatcher(NAMESPACE, MagicMock(), apps_api=mock_apps)
+
+        watcher.sync()
+
+        assert watcher._last_rv == "42"
+
+
+    def test_resync_notifies_changes_missed_by_the_watch(self):
+        watcher, cb, mock_apps = _make_watcher(
+            [_make_deployment("api", parent="db"), _make_deployment("web", parent="api"), _make_deployment("db")]
+        )
+        mock_apps.list_namespaced_deployment.return_value.items = [
+            _make_deployment("web", parent="db"),
+            _make_deployment("db"),
+            _make_deployment("worker", parent="db"),
+        ]
+
+        watcher.sync()
+
+        assert watcher.parents == {"web": "db", "db": None, "worker": "db"}
+        assert sorted(call.args[0] for call in cb.call_args_list) == ["api", "web", "worker"]
+
+
+class TestEvents:
+    def test_added_event_updates_cache(self):
+        watcher, cb, _ = _make_watcher()
+
+        watcher._process_event({"type": "ADDED", "object": _make_deployment("api", parent="db")})
+
+        assert watcher.parents == {"api": "db"}
+        cb.assert_called_once_with("api")
+
+    def test_deleted_event_evicts_cache(self):
+        api = _make_deployment("api", parent="db")
+        watcher, cb, _ = _make_watcher([api])
+
+        watcher._process_event({"type": "DELETED", "object": api})
+
+        assert watcher.parents == {}
+        cb.assert_called_once_with("api")
+
+    def test_parent_change_notifies(self):
+        watcher, cb, _ = _make_watcher([_make_deployment("api", parent="db")])
+
+        watcher._process_event({"type": "MODIFIED", "object": _make_deployment("api", parent="cache")})
+
+        assert watcher.parents == {"api": "cache"}
+        cb.assert_called_once_with("api")
+
+    def test_unchanged_parent_does_not_notify(self):
+        watcher, cb, _ = _make_watcher([_make_deployment("api", parent="db")])
+
+        watcher._process_event({"type": "MODIFIED", "object": _make_deployment("api", parent="db")})
+
+        cb.assert_not_called()
+        assert watcher.parents == {"api": "db"}
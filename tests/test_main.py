@@ -1,7 +1,11 @@
 """Tests for the Controller class in main.py."""
 
+from types import SimpleNamespace
 from unittest.mock import MagicMock
 
+import pytest
+from kubernetes.client import AppsV1Api
+
 from restart_controller.dependency_tree import DependencyTree
 from restart_controller.main import Controller
 from restart_controller.watcher import Watcher
@@ -11,105 +15,196 @@ DB = "db"
 API = "api"
 WORKER = "worker"
 FRONTEND = "frontend"
+PARENT_ANNO = Watcher.ANNOTATION_PARENT
+# Stands in for the core API where the test never calls it.
+_CORE_SENTINEL = object()
+
+
+@pytest.fixture(scope="class")
+def apps_api():
+    """Mocked AppsV1Api shared by the tests of a class."""
+    return MagicMock(spec_set=AppsV1Api)
+
+
+@pytest.fixture(autouse=True)
+def _reset_apps_api(apps_api):
+    yield
+    apps_api.reset_mock(return_value=True, side_effect=True)
+
+
+@pytest.fixture(scope="class")
+def cascade_tree():
+    """db -> api, db -> worker. Shared by a test class: tests must not mutate it."""
+    tree = DependencyTree()
+    tree.add(DB, [API, WORKER])
+    return tree
+
+
+@pytest.fixture(scope="class")
+def chain_tree():
+    """db -> api -> frontend. Shared by a test class: tests must not mutate it."""
+    tree = DependencyTree()
+    tree.add(DB, [API])
+    tree.add(API, [FRONTEND])
+    return tree
 
 
 def _make_deployment(name: str, annotations: dict[str, str] | None = None):
-    """Create a mock deployment object."""
-    dep = MagicMock()
-    dep.metadata.name = name
-    dep.metadata.annotations = annotations
-    return dep
+    """Create a fake deployment object."""
+    return SimpleNamespace(metadata=SimpleNamespace(name=name, annotations=annotations))
+
+
+CHAIN = (
+    _make_deployment(DB, {}),
+    _make_deployment(API, {PARENT_ANNO: DB}),
+    _make_deployment(FRONTEND, {PARENT_ANNO: API}),
+)
+FANOUT = (
+    _make_deployment(DB, {}),
+    _make_deployment(API, {PARENT_ANNO: DB}),
+    _make_deployment(WORKER, {PARENT_ANNO: DB}),
+)
+NO_ANNO = (
+    _make_deployment("app1", {}),
+    _make_deployment("app2", None),
+)
 
 
 def _make_controller(apps_api: MagicMock) -> Controller:
-    """Create a Controller with mocked APIs."""
-    mock_k8s_core = MagicMock()
-    return Controller(NAMESPACE, apps_api, mock_k8s_core)
+    """Create a Controller with mocked APIs and a seeded deployment cache."""
+    ctrl = Controller(NAMESPACE, apps_api, _CORE_SENTINEL)
+    ctrl._deployment_watcher.sync()
+    return ctrl
 
 
 class TestBuildTree:
-    def test_empty_namespace(self):
-        mock_k8s_client = MagicMock()
-        mock_k8s_client.list_namespaced_deployment.return_value.items = []
-
-        ctrl = _make_controller(mock_k8s_client)
-        tree = ctrl.build_tree()
-        assert tree.get_children("anything") == set()
-
-    def test_builds_tree_from_annotations(self):
-        deps = [
-            _make_deployment(DB, {}),
-            _make_deployment(API, {Watcher.ANNOTATION_PARENT: DB}),
-            _make_deployment(FRONTEND, {Watcher.ANNOTATION_PARENT: API}),
+    @pytest.mark.parametrize(
+        "deps, parent, expected_children",
+        [
+            ((), "anything", set()),
+            (CHAIN, DB, {API}),
+            (CHAIN, API, {FRONTEND}),
+            (FANOUT, DB, {API, WORKER}),
+            (NO_ANNO, "app1", set()),
+        ],
+    )
+    def test_children_from_annotations(self, apps_api, deps, parent, expected_children):
+        apps_api.list_namespaced_deployment.return_value.items = deps
+
+        ctrl = _make_controller(apps_api)
+        assert ctrl.build_tree().get_children(parent) == expected_children
+
+    def test_descendants_from_annotations(self, apps_api):
+        apps_api.list_namespaced_deployment.return_value.items = CHAIN
+
+        ctrl = _make_controller(apps_api)
+        assert ctrl.build_tree().get_descendants(DB) == frozenset({API, FRONTEND})
+
+    def test_reads_from_cache(self, apps_api):
+        apps_api.list_namespaced_deployment.return_value.items = [
+            _make_deployment(API, {PARENT_ANNO: DB}),
         ]
-        mock_k8s_client = MagicMock()
-        mock_k8s_client.list_namespaced_deployment.return_value.items = deps
 
-        ctrl = _make_controller(mock_k8s_client)
-        tree = ctrl.build_tree()
-        assert tree.get_children(DB) == {API}
-        assert tree.get_children(API) == {FRONTEND}
-        assert tree.get_descendants(DB) == frozenset({API, FRONTEND})
-
-    def test_multiple_children(self):
-        deps = [
-            _make_deployment(DB, {}),
-            _make_deployment(API, {Watcher.ANNOTATION_PARENT: DB}),
-            _make_deployment(WORKER, {Watcher.ANNOTATION_PARENT: DB}),
-        ]
-        mock_k8s_client = MagicMock()
-        mock_k8s_client.list_namespaced_deployment.return_value.items = deps
+        ctrl = _make_controller(apps_api)
+        ctrl.build_tree()
+        ctrl.build_tree()
 
-        ctrl = _make_controller(mock_k8s_client)
-        tree = ctrl.build_tree()
-        assert tree.get_children(DB) == {API, WORKER}
+        apps_api.list_namespaced_deployment.assert_called_once()
 
-    def test_no_annotations(self):
-        deps = [
-            _make_deployment("app1", {}),
-            _make_deployment("app2", None),
-        ]
-        mock_k8s_client = MagicMock()
-        mock_k8s_client.list_namespaced_deployment.return_value.items = deps
 
-        ctrl = _make_controller(mock_k8s_client)
-        tree = ctrl.build_tree()
-        assert tree.get_children("app1") == set()
+class TestOnChange:
+    def _make_controller_with_tree(self, apps_api: MagicMock, tree: DependencyTree) -> Controller:
+        """Create a controller using the given tree."""
+        ctrl = Controller(NAMESPACE, apps_api, _CORE_SENTINEL)
+        ctrl._tree = tree
+        return ctrl
 
+    def test_cascades_restart_to_children(self, apps_api, cascade_tree):
+        ctrl = self._make_controller_with_tree(apps_api, cascade_tree)
 
-class TestOnChange:
-    def _make_controller_with_tree(self, tree: DependencyTree) -> Controller:
-        """Create a controller whose build_tree returns the given tree."""
-        mock_k8s_client = MagicMock()
-        mock_k8s_core = MagicMock()
-        ctrl = Controller(NAMESPACE, mock_k8s_client, mock_k8s_core)
-        ctrl.build_tree = lambda: tree  # type: ignore[assignment]
+        patch = apps_api.patch_namespaced_deployment
+
+        ctrl._handle_changes({DB})
+
+        assert patch.call_count == 2
+
+    def test_no_restart_for_leaf(self, apps_api, cascade_tree):
+        ctrl = self._make_controller_with_tree(apps_api, cascade_tree)
+
+        patch = apps_api.patch_namespaced_deployment
+
+        ctrl._handle_changes({API})
+
+        patch.assert_not_called()
+
+    def test_transitive_cascade(self, apps_api, chain_tree):
+        ctrl = self._make_controller_with_tree(apps_api, chain_tree)
+
+        patch = apps_api.patch_namespaced_deployment
+
+        ctrl._handle_changes({DB})
+
+        assert patch.call_count == 2
+
+    def test_batch_restarts_shared_descendant_once(self, apps_api, chain_tree):
+        ctrl = self._make_controller_with_tree(apps_api, chain_tree)
+
+        patch = apps_api.patch_namespaced_deployment
+
+        ctrl._handle_changes({DB, API})
+
+        patch.assert_called_once()
+        assert patch.call_args[0][0] == FRONTEND
+
+
+class TestOnDependencyChange:
+    def _make_controller(self, deps: list) -> Controller:
+        mock_k8s_client = MagicMock(spec_set=AppsV1Api)
+        mock_k8s_client.list_namespaced_deployment.return_value.items = deps
+        ctrl = _make_controller(mock_k8s_client)
+        ctrl._tree = ctrl.build_tree()
         return ctrl
 
-    def test_cascades_restart_to_children(self):
-        tree = DependencyTree()
-        tree.add(DB, [API, WORKER])
-        ctrl = self._make_controller_with_tree(tree)
+    def test_new_child_is_added_to_tree(self):
+        ctrl = self._make_controller([_make_deployment(DB, {})])
 
-        ctrl._on_change(DB)
+        ctrl._deployment_watcher._process_event({"type": "ADDED", "object": _make_deployment(API, {PARENT_ANNO: DB})})
 
-        assert ctrl._restart_mgr._apps_api.patch_namespaced_deployment.call_count == 2
+        assert ctrl._tree.get_children(DB) == {API}
 
-    def test_no_restart_for_leaf(self):
-        tree = DependencyTree()
-        tree.add(DB, [API])
-        ctrl = self._make_controller_with_tree(tree)
+    def test_reparented_child_moves_in_tree(self):
+        ctrl = self._make_controller(
+            [
+                _make_deployment(API, {PARENT_ANNO: DB}),
+                _make_deployment(WORKER, {PARENT_ANNO: DB}),
+            ]
+        )
 
-        ctrl._on_change(API)
+        ctrl._deployment_watcher._process_event(
+            {"type": "MODIFIED", "object": _make_deployment(WORKER, {PARENT_ANNO: API})}
+        )
 
-        ctrl._restart_mgr._apps_api.patch_namespaced_deployment.assert_not_called()
+        assert ctrl._tree.get_children(DB) == {API}
+        assert ctrl._tree.get_descendants(DB) == frozenset({API, WORKER})
+        assert ctrl._tree.get_children(API) == {WORKER}
 
-    def test_transitive_cascade(self):
-        tree = DependencyTree()
-        tree.add(DB, [API])
-        tree.add(API, [FRONTEND])
-        ctrl = self._make_controller_with_tree(tree)
+    def test_deleted_child_is_removed_from_tree(self):
+        api = _make_deployment(API, {PARENT_ANNO: DB})
+        ctrl = self._make_controller([api])
 
+        ctrl._deployment_watcher._process_event({"type": "DELETED", "object": api})
+
+        assert ctrl._tree.compute_restart_set({DB}) == set()
+
+
+class TestDebounce:
+    def test_coalesces_changes_within_window(self, apps_api):
+        ctrl = Controller(NAMESPACE, apps_api, _CORE_SENTINEL)
+        ctrl.DEBOUNCE = 0.01
+
+        ctrl._on_change(DB)
         ctrl._on_change(DB)
+        ctrl._on_change(API)
 
-        assert ctrl._restart_mgr._apps_api.patch_namespaced_deployment.call_count == 2
+        assert ctrl._next_batch() == {DB, API}
+        assert ctrl._changes.empty()
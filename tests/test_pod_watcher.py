@@ -1,46 +1,47 @@
 """Tests for PodWatcher."""
 
-from unittest.mock import MagicMock
+import io
+import json
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+import pytest
+from kubernetes.client import ApiClient, AppsV1Api, CoreV1Api, V1Pod
+from urllib3 import HTTPResponse
 
 from restart_controller.pod_watcher import PodWatcher
 
 NAMESPACE = "test-ns"
+# Stands in for the apps API where no ReplicaSet lookup is reached.
+_APPS_SENTINEL = object()
 
 
 def _make_pod(name: str, restart_count: int = 0, owner_rs: str | None = None):
-    """Create a mock pod object."""
-    pod = MagicMock()
-    pod.metadata.name = name
-
-    cs = MagicMock()
-    cs.restart_count = restart_count
-    pod.status.container_statuses = [cs]
-
-    if owner_rs:
-        owner = MagicMock()
-        owner.kind = "ReplicaSet"
-        owner.name = owner_rs
-        pod.metadata.owner_references = [owner]
-    else:
-        pod.metadata.owner_references = []
-
-    return pod
+    """Create a fake pod object."""
+    cs = SimpleNamespace(restart_count=restart_count)
+    owner_refs = [SimpleNamespace(kind="ReplicaSet", name=owner_rs)] if owner_rs else []
+    return SimpleNamespace(
+        metadata=SimpleNamespace(name=name, owner_references=owner_refs),
+        status=SimpleNamespace(container_statuses=[cs]),
+    )
 
 
 def _make_watcher(on_change: MagicMock | None = None, deployment_for_rs: str | None = None):
-    """Create a PodWatcher with mocked APIs."""
-    mock_apps = MagicMock()
-    mock_core = MagicMock()
+    """Create a PodWatcher with mocked APIs.
+
+    The apps API is only mocked when deployment_for_rs is given; otherwise no
+    ReplicaSet lookup is expected and a sentinel is passed.
+    """
+    mock_apps = MagicMock(spec_set=AppsV1Api) if deployment_for_rs else _APPS_SENTINEL
+    mock_core = MagicMock(spec_set=CoreV1Api)
     cb = on_change or MagicMock()
     watcher = PodWatcher(NAMESPACE, cb, apps_api=mock_apps, core_api=mock_core)
 
     if deployment_for_rs:
-        rs = MagicMock()
-        rs_owner = MagicMock()
-        rs_owner.kind = "Deployment"
-        rs_owner.name = deployment_for_rs
-        rs.metadata.owner_references = [rs_owner]
-        mock_apps.read_namespaced_replica_set.return_value = rs
+        rs_owner = SimpleNamespace(kind="Deployment", name=deployment_for_rs)
+        mock_apps.read_namespaced_replica_set.return_value = SimpleNamespace(
+            metadata=SimpleNamespace(owner_references=[rs_owner])
+        )
 
     return watcher, cb
 
@@ -98,10 +99,44 @@ class TestRestartCountIncrease:
 
     def test_no_container_statuses_ignored(self):
         watcher, cb = _make_watcher()
-        pod = MagicMock()
-        pod.metadata.name = "my-pod"
+        pod = _make_pod("my-pod")
         pod.status.container_statuses = None
 
         watcher._process_event({"type": "MODIFIED", "object": pod})
 
         cb.assert_not_called()
+
+
+class _StopWatching(Exception):
+    """Raised from _process_event to leave the infinite watch loop."""
+
+
+class TestLabelSelector:
+    def test_watches_all_pods_by_default(self):
+        watcher, _ = _make_watcher()
+
+        assert watcher._list_func == watcher._core_api.list_namespaced_pod
+        assert watcher._watch_kwargs == {}
+
+    def test_selector_watch_yields_pod_objects(self):
+        event = {"type": "ADDED", "object": {"kind": "Pod", "metadata": {"name": "my-pod", "resourceVersion": "5"}}}
+        api_client = ApiClient()
+        api_client.rest_client.pool_manager = MagicMock()
+        api_client.rest_client.pool_manager.request.return_value = HTTPResponse(
+            body=io.BytesIO(json.dumps(event).encode() + b"\n"), status=200, preload_content=False
+        )
+        watcher = PodWatcher(
+            NAMESPACE, MagicMock(), apps_api=_APPS_SENTINEL, core_api=CoreV1Api(api_client), label_selector="tier=db"
+        )
+
+        with patch.object(watcher, "_process_event", side_effect=_StopWatching) as process_event:
+            with pytest.raises(_StopWatching):
+                watcher.watch()
+
+        pod = process_event.call_args.args[0]["object"]
+        assert isinstance(pod, V1Pod)
+        assert pod.metadata.name == "my-pod"
+        # Older clients send the query as fields, newer ones encode it in the URL.
+        request = str(api_client.rest_client.pool_manager.request.call_args)
+        assert "labelSelector" in request
+        assert "tier" in request
@@ -0,0 +1,69 @@
+"""Tests for ReplicaSetWatcher."""
+
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+from kubernetes.client import ApiException, AppsV1Api
+
+from restart_controller.replica_set_watcher import ReplicaSetWatcher
+
+NAMESPACE = "test-ns"
+
+
+def _make_replica_set(name: str, deployment: str | None = None):
+    """Create a fake ReplicaSet object."""
+    owner_refs = [SimpleNamespace(kind="Deployment", name=deployment)] if deployment else []
+    return SimpleNamespace(metadata=SimpleNamespace(name=name, owner_references=owner_refs))
+
+
+def _make_watcher(replica_sets: list | None = None):
+    """Create a ReplicaSetWatcher with a mocked API and a seeded cache."""
+    mock_apps = MagicMock(spec_set=AppsV1Api)
+    mock_apps.list_namespaced_replica_set.return_value.items = replica_sets or []
+    watcher = ReplicaSetWatcher(NAMESPACE, apps_api=mock_apps)
+    watcher.sync()
+    return watcher, mock_apps
+
+
+class TestGetDeployment:
+    def test_resolves_from_listed_replica_sets(self):
+        watcher, mock_apps = _make_watcher([_make_replica_set("my-app-rs", "my-app")])
+
+        assert watcher.get_deployment("my-app-rs") == "my-app"
+        mock_apps.read_namespaced_replica_set.assert_not_called()
+
+    def test_replica_set_without_deployment(self):
+        watcher, mock_apps = _make_watcher([_make_replica_set("bare-rs")])
+
+        assert watcher.get_deployment("bare-rs") is None
+        mock_apps.read_namespaced_replica_set.assert_not_called()
+
+    def test_resolves_from_watch_events(self):
+        watcher, mock_apps = _make_watcher()
+
+        watcher._process_event({"type": "ADDED", "object": _make_replica_set("my-app-rs", "my-app")})
+
+        assert watcher.get_deployment("my-app-rs") == "my-app"
+        mock_apps.read_namespaced_replica_set.assert_not_called()
+
+    def test_unseen_replica_set_is_looked_up_once(self):
+        watcher, mock_apps = _make_watcher()
+        mock_apps.read_namespaced_replica_set.return_value = _make_replica_set("new-rs", "my-app")
+
+        assert watcher.get_deployment("new-rs") == "my-app"
+        assert watcher.get_deployment("new-rs") == "my-app"
+        mock_apps.read_namespaced_replica_set.assert_called_once_with("new-rs", NAMESPACE)
+
+    def test_failed_lookup_returns_none(self):
+        watcher, mock_apps = _make_watcher()
+        mock_apps.read_namespaced_replica_set.side_effect = ApiException(status=404, reason="Not Found")
+
+        assert watcher.get_deployment("gone-rs") is None
+
+    def test_deleted_replica_set_is_evicted(self):
+        rs = _make_replica_set("my-app-rs", "my-app")
+        watcher, _ = _make_watcher([rs])
+
+        watcher._process_event({"type": "DELETED", "object": rs})
+
+        assert "my-app-rs" not in watcher._rs_to_deployment
@@ -1,64 +1,68 @@
 """Tests for RestartManager."""
 
+from datetime import datetime, timezone
 from unittest.mock import MagicMock
 
+import pytest
+from kubernetes.client import ApiException, AppsV1Api
+
 from restart_controller.restart_manager import RestartManager
 
 NAMESPACE = "test-ns"
 DEPLOYMENT_NAME = "my-app"
 REASON = "parent db changed"
+LAST_RESTART_ANNO = RestartManager.ANNOTATION_LAST_RESTART
+REASON_ANNO = RestartManager.ANNOTATION_REASON
+_NOT_FOUND = ApiException(status=404, reason="Not Found")
 
 
-class TestRestart:
-    def test_patches_deployment_with_annotations(self):
-        mock_k8s = MagicMock()
-        mgr = RestartManager(NAMESPACE, mock_k8s)
-
-        mgr.restart(DEPLOYMENT_NAME, REASON)
+@pytest.fixture(scope="class")
+def apps_api():
+    """Mocked AppsV1Api shared by the tests of a class."""
+    return MagicMock(spec_set=AppsV1Api)
 
-        mock_k8s.patch_namespaced_deployment.assert_called_once()
-        args = mock_k8s.patch_namespaced_deployment.call_args
-        assert args[0][0] == DEPLOYMENT_NAME
-        assert args[0][1] == NAMESPACE
 
-        patch_body = args[0][2]
-        annotations = patch_body["spec"]["template"]["metadata"]["annotations"]
-        assert RestartManager.ANNOTATION_LAST_RESTART in annotations
-        assert annotations[RestartManager.ANNOTATION_REASON] == REASON
+@pytest.fixture(autouse=True)
+def _reset_apps_api(apps_api):
+    yield
+    apps_api.reset_mock(return_value=True, side_effect=True)
 
-    def test_logs_error_on_api_failure(self):
-        from kubernetes.client import ApiException
 
-        mock_k8s = MagicMock()
-        mock_k8s.patch_namespaced_deployment.side_effect = ApiException(status=404, reason="Not Found")
-        mgr = RestartManager(NAMESPACE, mock_k8s)
+@pytest.fixture
+def fake_clock(monkeypatch):
+    """Monotonic clock that tests advance by hand through fake_clock[0]."""
+    now = [1000.0]
+    monkeypatch.setattr("restart_controller.restart_manager.time.monotonic", lambda: now[0])
+    return now
 
-        mgr.restart(DEPLOYMENT_NAME, REASON)
 
-    def test_uses_namespace(self):
-        other_namespace = "other-ns"
-        mock_k8s = MagicMock()
-        mgr = RestartManager(other_namespace, mock_k8s)
-
-        mgr.restart(DEPLOYMENT_NAME, REASON)
-
-        args = mock_k8s.patch_namespaced_deployment.call_args
-        assert args[0][1] == other_namespace
-
-    def test_returns_true_on_success(self):
-        mock_k8s = MagicMock()
-        mgr = RestartManager(NAMESPACE, mock_k8s)
+class TestRestart:
+    @pytest.mark.parametrize("namespace", [NAMESPACE, "other-ns"])
+    def test_patches_deployment_with_annotations(self, apps_api, namespace):
+        mgr = RestartManager(namespace, apps_api)
 
         result = mgr.restart(DEPLOYMENT_NAME, REASON)
 
         assert result is True
+        apps_api.patch_namespaced_deployment.assert_called_once()
+        args = apps_api.patch_namespaced_deployment.call_args
+        assert args[0][0] == DEPLOYMENT_NAME
+        assert args[0][1] == namespace
+
+        patch_body = args[0][2]
+        annotations = patch_body["spec"]["template"]["metadata"]["annotations"]
+        assert LAST_RESTART_ANNO in annotations
+        assert annotations[REASON_ANNO] == REASON
 
-    def test_returns_false_on_api_failure(self):
-        from kubernetes.client import ApiException
+    def test_logs_error_on_api_failure(self, apps_api):
+        apps_api.patch_namespaced_deployment.side_effect = _NOT_FOUND
+        mgr = RestartManager(NAMESPACE, apps_api)
+
+        mgr.restart(DEPLOYMENT_NAME, REASON)
 
-        mock_k8s = MagicMock()
-        mock_k8s.patch_namespaced_deployment.side_effect = ApiException(status=404, reason="Not Found")
-        mgr = RestartManager(NAMESPACE, mock_k8s)
+    def test_returns_false_on_api_failure(self, apps_api):
+        apps_api.patch_namespaced_deployment.side_effect = _NOT_FOUND
+        mgr = RestartManager(NAMESPACE, apps_api)
 
         result = mgr.restart(DEPLOYMENT_NAME, REASON)
 
@@ -66,35 +70,66 @@ class TestRestart:
 
 
 class TestCooldown:
-    def test_skips_restart_within_cooldown(self):
-        mock_k8s = MagicMock()
-        mgr = RestartManager(NAMESPACE, mock_k8s)
+    def test_skips_restart_within_cooldown(self, apps_api):
+        mgr = RestartManager(NAMESPACE, apps_api)
 
         mgr.restart(DEPLOYMENT_NAME, REASON)
         result = mgr.restart(DEPLOYMENT_NAME, REASON)
 
         assert result is False
-        assert mock_k8s.patch_namespaced_deployment.call_count == 1
-
-    def test_allows_restart_after_cooldown(self):
-        mock_k8s = MagicMock()
-        mgr = RestartManager(NAMESPACE, mock_k8s)
+        assert apps_api.patch_namespaced_deployment.call_count == 1
+
+    @pytest.mark.parametrize(
+        ("elapsed", "expected"),
+        [
+            (0.0, False),
+            (RestartManager.COOLDOWN - 1, False),
+            (RestartManager.COOLDOWN, True),
+            (RestartManager.COOLDOWN + 1, True),
+        ],
+    )
+    def test_restart_allowed_once_cooldown_elapsed(self, apps_api, fake_clock, elapsed, expected):
+        mgr = RestartManager(NAMESPACE, apps_api)
 
         mgr.restart(DEPLOYMENT_NAME, REASON)
+        fake_clock[0] += elapsed
+        result = mgr.restart(DEPLOYMENT_NAME, REASON)
 
-        mgr._last_restart[DEPLOYMENT_NAME] -= RestartManager.COOLDOWN + 1
+        assert result is expected
+        assert apps_api.patch_namespaced_deployment.call_count == 1 + expected
 
-        result = mgr.restart(DEPLOYMENT_NAME, REASON)
+    def test_failed_restart_does_not_start_cooldown(self, apps_api):
+        apps_api.patch_namespaced_deployment.side_effect = [ApiException(status=500, reason="Error"), None]
+        mgr = RestartManager(NAMESPACE, apps_api)
 
-        assert result is True
-        assert mock_k8s.patch_namespaced_deployment.call_count == 2
+        assert mgr.restart(DEPLOYMENT_NAME, REASON) is False
+        assert mgr.restart(DEPLOYMENT_NAME, REASON) is True
+        assert apps_api.patch_namespaced_deployment.call_count == 2
 
-    def test_different_deployments_not_affected(self):
-        mock_k8s = MagicMock()
-        mgr = RestartManager(NAMESPACE, mock_k8s)
+    def test_different_deployments_not_affected(self, apps_api):
+        mgr = RestartManager(NAMESPACE, apps_api)
 
         mgr.restart("app1", REASON)
         result = mgr.restart("app2", REASON)
 
         assert result is True
-        assert mock_k8s.patch_namespaced_deployment.call_count == 2
+        assert apps_api.patch_namespaced_deployment.call_count == 2
+
+    def test_expired_entries_are_dropped(self, apps_api, fake_clock):
+        mgr = RestartManager(NAMESPACE, apps_api)
+
+        mgr.restart("app1", REASON)
+        fake_clock[0] += RestartManager.COOLDOWN + 1
+        mgr.restart("app2", REASON)
+
+        assert list(mgr._last_restart) == ["app2"]
+
+
+class TestTimestamp:
+    def test_iso8601_utc(self):
+        before = datetime.now(timezone.utc)
+        parsed = datetime.fromisoformat(RestartManager._timestamp())
+        after = datetime.now(timezone.utc)
+
+        assert parsed.tzinfo == timezone.utc
+        assert before.replace(microsecond=0) <= parsed <= after
@@ -0,0 +1,145 @@
+"""Tests for the Watcher base class."""
+
+import io
+import json
+from unittest.mock import MagicMock, patch
+
+import pytest
+from kubernetes.client import ApiClient, ApiException, CoreV1Api
+from urllib3 import HTTPResponse
+
+from restart_controller.restart_manager import RestartManager
+from restart_controller.watcher import Watcher
+
+NAMESPACE = "test-ns"
+
+
+class _StopWatching(Exception):
+    """Raised by the fake stream to leave the infinite watch loop."""
+
+
+class _RecordingWatcher(Watcher):
+    def __init__(self) -> None:
+        super().__init__(NAMESPACE, MagicMock())
+        self.list_func = MagicMock()
+        self.events: list[dict] = []
+
+    @property
+    def _list_func(self):
+        return self.list_func
+
+    def _process_event(self, event: dict) -> None:
+        self.events.append(event)
+
+
+def _bookmark(resource_version: str) -> dict:
+    """Create a BOOKMARK event as yielded by Watch.stream."""
+    raw = {"metadata": {"resourceVersion": resource_version}}
+    return {"type": "BOOKMARK", "object": raw, "raw_object": raw}
+
+
+def _run_watch(watcher: Watcher, streams: list):
+    """Run watcher.watch() against fake streams, one per (re)connection.
+
+    Each entry is either a list of (event, resource_version) pairs or an
+    exception to raise. Returns the mocked Watch so calls can be inspected.
+    """
+    mock_watch = MagicMock()
+    remaining = iter(streams + [_StopWatching()])
+
+    def stream(*args, **kwargs):
+        current = next(remaining)
+        if isinstance(current, Exception):
+            raise current
+        for event, rv in current:
+            mock_watch.resource_version = rv
+            yield event
+
+    mock_watch.stream.side_effect = stream
+    with patch("restart_controller.watcher.watch.Watch", return_value=mock_watch):
+        with pytest.raises(_StopWatching):
+            watcher.watch()
+    return mock_watch
+
+
+class TestWatch:
+    def test_starts_from_api_server_cache(self):
+        watcher = _RecordingWatcher()
+
+        mock_watch = _run_watch(watcher, [])
+
+        kwargs = mock_watch.stream.call_args.kwargs
+        assert kwargs["namespace"] == NAMESPACE
+        assert kwargs["resource_version"] == Watcher.CACHED_RESOURCE_VERSION
+        assert kwargs["allow_watch_bookmarks"] is True
+        assert kwargs["timeout_seconds"] == Watcher.WATCH_TIMEOUT
+
+    def test_bookmarks_are_not_processed(self):
+        watcher = _RecordingWatcher()
+        added = {"type": "ADDED", "object": MagicMock()}
+
+        _run_watch(watcher, [[(added, "10"), (_bookmark("20"), "20")]])
+
+        assert watcher.events == [added]
+
+    def test_resumes_from_last_event(self):
+        watcher = _RecordingWatcher()
+        added = {"type": "ADDED", "object": MagicMock()}
+
+        mock_watch = _run_watch(watcher, [[(added, "10")], []])
+
+        assert mock_watch.stream.call_args_list[1].kwargs["resource_version"] == "10"
+
+    def test_resumes_from_bookmark_untracked_by_client(self):
+        watcher = _RecordingWatcher()
+
+        mock_watch = _run_watch(watcher, [[(_bookmark("20"), None)], []])
+
+        assert mock_watch.stream.call_args_list[1].kwargs["resource_version"] == "20"
+
+    def test_resumes_from_bookmark_through_real_watch(self):
+        bookmark = {"type": "BOOKMARK", "object": {"kind": "Pod", "metadata": {"resourceVersion": "12345"}}}
+        api_client = ApiClient()
+        api_client.rest_client.pool_manager = MagicMock()
+        api_client.rest_client.pool_manager.request.side_effect = [
+            HTTPResponse(body=io.BytesIO(json.dumps(bookmark).encode() + b"\n"), status=200, preload_content=False),
+            _StopWatching(),
+        ]
+        watcher = _RecordingWatcher()
+        watcher.list_func = CoreV1Api(api_client).list_namespaced_pod
+
+        with pytest.raises(_StopWatching):
+            watcher.watch()
+
+        assert watcher.events == []
+        assert "12345" in str(api_client.rest_client.pool_manager.request.call_args)
+
+    def test_syncs_again_when_gone(self):
+        watcher = _RecordingWatcher()
+
+        with patch.object(watcher, "sync", wraps=watcher.sync) as sync:
+            mock_watch = _run_watch(watcher, [[(_bookmark("20"), "20")], ApiException(status=410, reason="Gone"), []])
+
+        sync.assert_called_once_with()
+        assert mock_watch.stream.call_args_list[2].kwargs["resource_version"] == Watcher.CACHED_RESOURCE_VERSION
+
+    def test_other_api_errors_propagate(self):
+        watcher = _RecordingWatcher()
+
+        with pytest.raises(ApiException):
+            _run_watch(watcher, [ApiException(status=403, reason="Forbidden")])
+
+
+class TestHasRestartAnnotations:
+    def test_parent_annotation(self):
+        assert Watcher._has_restart_annotations({Watcher.ANNOTATION_PARENT: "db"})
+
+    def test_restart_annotations(self):
+        annotations = {"other": "x", RestartManager.ANNOTATION_LAST_RESTART: "2025-01-01T00:00:00Z"}
+        assert Watcher._has_restart_annotations(annotations)
+
+    def test_unrelated_annotations(self):
+        assert not Watcher._has_restart_annotations({"app.kubernetes.io/name": "db"})
+
+    def test_empty(self):
+        assert not Watcher._has_restart_annotations({})